@@ -4,6 +4,7 @@ import sys
 from typing import Optional
 
 from .core import DbtIncrementalCI
+from .dbt_cloud import DEFAULT_CACHE_DIR
 
 
 def setup_logging(verbose: bool = False):
@@ -44,9 +45,16 @@ def setup_logging(verbose: bool = False):
 )
 @click.option(
     '--dbt-cloud-run-id',
-    type=str,
+    type=int,
     help='Optional: specific dbt Cloud run ID (uses latest successful if not provided)'
 )
+@click.option(
+    '--cache-dir',
+    default=DEFAULT_CACHE_DIR,
+    show_default=True,
+    type=click.Path(file_okay=False, dir_okay=True),
+    help='Directory where dbt Cloud manifests are cached by run ID, so a repeated run skips the download'
+)
 @click.option(
     '--dbt-project-dir',
     required=True,
@@ -76,6 +84,17 @@ def setup_logging(verbose: bool = False):
     type=int,
     help='Number of parallel threads for copying tables (default: 1)'
 )
+@click.option(
+    '--fail-fast',
+    is_flag=True,
+    help='Stop copying remaining tables after the first failed copy'
+)
+@click.option(
+    '--dbt-runner/--no-dbt-runner',
+    default=True,
+    help='Run dbt ls in-process when dbt-core is importable (default), '
+         'or always run the dbt executable on PATH'
+)
 @click.option(
     '--verbose',
     '-v',
@@ -92,12 +111,15 @@ def main(
     dbt_cloud_token: str,
     dbt_cloud_account_id: str,
     dbt_cloud_job_id: str,
-    dbt_cloud_run_id: str,
+    dbt_cloud_run_id: int,
+    cache_dir: str,
     dbt_project_dir: str,
     database_uri: str,
     ci_schema: str,
     base_schema: str,
     threads: int,
+    fail_fast: bool,
+    dbt_runner: bool,
     verbose: bool,
     dry_run: bool
 ):
@@ -174,9 +196,12 @@ def main(
             dbt_cloud_account_id=dbt_cloud_account_id,
             dbt_cloud_job_id=dbt_cloud_job_id,
             dbt_cloud_run_id=dbt_cloud_run_id,
+            cache_dir=cache_dir,
             base_schema=base_schema,
             threads=threads,
-            dry_run=dry_run
+            dry_run=dry_run,
+            fail_fast=fail_fast,
+            use_dbt_runner=dbt_runner
         )
 
         # Run the workflow
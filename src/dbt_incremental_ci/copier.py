@@ -1,8 +1,15 @@
 import logging
+import os
+import threading
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import List, Dict, Any
-from sqlalchemy import create_engine, text, MetaData, Table
-from sqlalchemy.engine import Engine
+from functools import cached_property, partial
+from typing import TYPE_CHECKING, List, Dict, Any, Iterable, Optional, Set
+from sqlalchemy import bindparam, create_engine, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+
+if TYPE_CHECKING:
+    from sqlalchemy.engine import Connection, Engine
 
 logger = logging.getLogger(__name__)
 
@@ -10,6 +17,10 @@ logger = logging.getLogger(__name__)
 class TableCopier:
     """Handles copying tables from production schema to CI schema."""
 
+    # CI copies can be recreated, so Postgres copy transactions don't wait for the WAL flush.
+    # Only issued to real Postgres servers; Redshift rejects the setting (see `_is_redshift`)
+    _ASYNC_COMMIT = "SET LOCAL synchronous_commit TO OFF"
+
     def __init__(self, database_uri: str, ci_schema: str, threads: int = 1, dry_run: bool = False, base_schema: str = None):
         self.database_uri = database_uri
         self.ci_schema = ci_schema
@@ -17,10 +28,35 @@ class TableCopier:
         self.threads = threads
         self.dry_run = dry_run
         # Only create engine if not in dry-run mode
-        self.engine = None if dry_run else create_engine(database_uri)
-
-    def _get_dialect_name(self) -> str:
-        """Get the SQL dialect name."""
+        self.engine = None if dry_run else self._create_engine(database_uri)
+        self._dialect_name = self._detect_dialect_name()
+        # Database the CI tables live in; sources in other databases are streamed across
+        try:
+            self._target_database = make_url(database_uri).database
+        except Exception:
+            self._target_database = None
+        # Engines for source databases other than the target, created on demand
+        self._source_engines: Dict[str, 'Engine'] = {}
+        self._source_engines_lock = threading.Lock()
+        # Schemas already created during this run
+        self._ensured_schemas: Set[str] = set()
+        self._ensured_lock = threading.Lock()
+        # One connection per worker thread, reused across the tables that thread copies
+        self._tls = threading.local()
+        self._tls_conns: List['Connection'] = []
+        self._tls_conns_lock = threading.Lock()
+
+    def _create_engine(self, database_uri: Any) -> 'Engine':
+        """Create an engine whose pool lets every worker thread hold a connection without waiting."""
+        url = make_url(database_uri)
+        options = {'pool_pre_ping': True}
+        # Pool sizing only applies to QueuePool; e.g. in-memory SQLite uses a pool that rejects it
+        if issubclass(url.get_dialect().get_pool_class(url), QueuePool):
+            options.update(pool_size=max(self.threads, 5), max_overflow=self.threads)
+        return create_engine(url, **options)
+
+    def _detect_dialect_name(self) -> str:
+        """Detect the SQL dialect name from the engine, or from the URI in dry-run mode."""
         if self.dry_run:
             # In dry-run mode, parse from URI
             if 'postgresql' in self.database_uri:
@@ -29,12 +65,77 @@ class TableCopier:
                 return 'redshift'
             elif 'bigquery' in self.database_uri:
                 return 'bigquery'
+            elif 'snowflake' in self.database_uri:
+                return 'snowflake'
             elif 'trino' in self.database_uri:
                 return 'trino'
             else:
                 return 'unknown'
         return self.engine.dialect.name
 
+    def _get_dialect_name(self) -> str:
+        """Get the SQL dialect name (detected once at init)."""
+        return self._dialect_name
+
+    @cached_property
+    def _is_redshift(self) -> bool:
+        """
+        Whether the server is Redshift.
+        Redshift reached through the postgresql dialect reports 'postgresql', so the
+        server version is probed once on first use.
+        """
+        dialect = self._get_dialect_name()
+        if dialect == 'redshift':
+            return True
+        if dialect != 'postgresql' or self.dry_run:
+            return False
+
+        try:
+            with self.engine.connect() as conn:
+                version = conn.execute(text("SELECT version()")).scalar() or ''
+        except Exception as e:
+            logger.debug("Could not probe server version: %s", e)
+            return False
+
+        return 'redshift' in version.lower()
+
+    def _is_cross_database(self, source_database: Optional[str]) -> bool:
+        """
+        Whether a source lives in a different Postgres database than the CI target.
+        Redshift queries other databases directly, so its sources never need streaming.
+        """
+        return (
+            self._get_dialect_name() == 'postgresql'
+            and bool(source_database)
+            and bool(self._target_database)
+            and source_database != self._target_database
+            and not self._is_redshift
+        )
+
+    def _supports_stream_copy(self) -> bool:
+        """Whether the driver exposes COPY streaming (psycopg2's copy_expert)."""
+        if self.dry_run:
+            # Resolve the driver the way create_engine would, including a dialect's default one
+            try:
+                url = make_url(self.database_uri)
+            except Exception:
+                return False
+            try:
+                return url.get_dialect().driver == 'psycopg2'
+            except Exception:
+                return url.drivername.partition('+')[2] == 'psycopg2'
+        return self.engine.dialect.driver == 'psycopg2'
+
+    def _get_source_engine(self, source_database: str) -> 'Engine':
+        """Get (or create) an engine connected to another database on the same server."""
+        with self._source_engines_lock:
+            engine = self._source_engines.get(source_database)
+            if engine is None:
+                url = make_url(self.database_uri).set(database=source_database)
+                engine = self._create_engine(url)
+                self._source_engines[source_database] = engine
+            return engine
+
     def _compute_target_schema(self, source_schema: str) -> str:
         """
         Compute the target CI schema based on source schema.
@@ -63,101 +164,272 @@ class TableCopier:
         # No custom suffix found, use CI schema as-is
         return self.ci_schema
 
-    def _create_schema_if_not_exists(self, schema_name: str):
-        """Create a single schema if it doesn't exist."""
-        if self.dry_run:
-            logger.info(f"[DRY RUN] Would create schema: {schema_name}")
-            return
+    def _create_schema_if_not_exists(self, schema_name: str, conn: Optional['Connection'] = None):
+        """
+        Create a single schema if it doesn't exist.
+        Each schema is attempted at most once per run, whether or not the attempt
+        succeeds; an open connection can be passed in to avoid checking out a new one.
+        """
+        with self._ensured_lock:
+            if schema_name in self._ensured_schemas:
+                return
+            self._ensured_schemas.add(schema_name)
 
-        dialect = self._get_dialect_name()
+            if self.dry_run:
+                logger.info("[DRY RUN] Would create schema: %s", schema_name)
+                return
 
-        if dialect == 'bigquery':
-            logger.info(f"BigQuery detected - ensure dataset {schema_name} exists")
-            return
+            dialect = self._get_dialect_name()
+
+            if dialect == 'bigquery':
+                logger.info("BigQuery detected - ensure dataset %s exists", schema_name)
+                return
 
-        with self.engine.connect() as conn:
             try:
-                if dialect in ['postgresql', 'redshift']:
-                    conn.execute(text(f"CREATE SCHEMA IF NOT EXISTS {schema_name}"))
-                elif dialect == 'trino':
-                    try:
-                        conn.execute(text(f"CREATE SCHEMA {schema_name}"))
-                    except Exception:
-                        pass
+                if conn is None:
+                    with self.engine.begin() as new_conn:
+                        self._execute_create_schema(new_conn, schema_name, dialect)
                 else:
-                    conn.execute(text(f"CREATE SCHEMA IF NOT EXISTS {schema_name}"))
-                conn.commit()
-                logger.info(f"Ensured schema {schema_name} exists")
+                    with conn.begin():
+                        self._execute_create_schema(conn, schema_name, dialect)
+                logger.info("Ensured schema %s exists", schema_name)
             except Exception as e:
-                logger.warning(f"Could not create schema {schema_name}: {e}")
+                # Not retried for later tables; their copies report the problem if it matters
+                logger.warning("Could not create schema %s: %s", schema_name, e)
 
-    def _ensure_schemas(self, nodes: List[Dict[str, Any]]):
-        """Collect distinct target schemas from all nodes and create them sequentially."""
-        seen = set()
-        for node in nodes:
-            source_schema = node.get('schema')
-            if source_schema:
-                target_schema = self._compute_target_schema(source_schema)
-                seen.add(target_schema)
+    def _execute_create_schema(self, conn: 'Connection', schema_name: str, dialect: str):
+        """Issue the dialect-specific CREATE SCHEMA statement on an open connection."""
+        if dialect in ['postgresql', 'redshift']:
+            conn.execute(text(f"CREATE SCHEMA IF NOT EXISTS {schema_name}"))
+        elif dialect == 'trino':
+            try:
+                conn.execute(text(f"CREATE SCHEMA {schema_name}"))
+            except Exception:
+                pass
+        else:
+            conn.execute(text(f"CREATE SCHEMA IF NOT EXISTS {schema_name}"))
 
-        for schema in seen:
-            self._create_schema_if_not_exists(schema)
+    def _find_existing_schemas(self, conn: 'Connection', schemas: List[str]) -> Set[str]:
+        """
+        Return which of the given schemas already exist, using a single catalog query.
+        Returns an empty set if the database has no information_schema to probe.
+        """
+        query = text(
+            "SELECT schema_name FROM information_schema.schemata WHERE schema_name IN :names"
+        ).bindparams(bindparam('names', expanding=True))
 
-    def _build_copy_query(
-        self,
-        source_database: str,
-        source_schema: str,
-        source_table: str,
-        target_table: str
-    ) -> str:
+        try:
+            with conn.begin():
+                return {row[0] for row in conn.execute(query, {'names': schemas})}
+        except Exception as e:
+            logger.debug("Could not look up existing schemas: %s", e)
+            return set()
+
+    def ensure_schemas(self, schemas: Iterable[str]):
         """
-        Build a SQL query to copy a table from source to target.
-        Handles different SQL dialects.
-        Preserves custom schema suffixes from source schema.
+        Create the given target schemas sequentially, sharing a single connection.
+        Schemas that already exist are found with one lookup and are not recreated.
         """
-        dialect = self._get_dialect_name()
+        pending = [schema for schema in sorted(schemas) if schema not in self._ensured_schemas]
+        if not pending:
+            return
 
-        # Determine full source table name
-        if source_database and dialect != 'bigquery':
-            source_full = f"{source_database}.{source_schema}.{source_table}"
-        else:
-            # For BigQuery and others without explicit database
-            source_full = f"{source_schema}.{source_table}"
+        if self.dry_run or self._get_dialect_name() == 'bigquery':
+            for schema in pending:
+                self._create_schema_if_not_exists(schema)
+            return
 
-        # Compute target schema with preserved custom suffix
-        target_schema = self._compute_target_schema(source_schema)
-        target_full = f"{target_schema}.{target_table}"
+        with self.engine.connect() as conn:
+            existing = self._find_existing_schemas(conn, pending)
+            if existing:
+                with self._ensured_lock:
+                    self._ensured_schemas.update(existing)
+                logger.info("Schemas already exist: %s", ', '.join(sorted(existing)))
+
+            for schema in pending:
+                if schema not in existing:
+                    self._create_schema_if_not_exists(schema, conn=conn)
+
+    def _qualify_source(self, source_database: Optional[str], source_relation: str) -> str:
+        """Prefix a `schema.table` source relation with its database where the dialect uses one."""
+        if source_database and self._get_dialect_name() != 'bigquery':
+            return f"{source_database}.{source_relation}"
+        # For BigQuery and others without explicit database
+        return source_relation
+
+    def _build_copy_query(self, source_full: str, target_full: str) -> List[str]:
+        """
+        Build the SQL statements to copy a table from source to target.
+        Handles different SQL dialects.
+        Both names are already fully qualified; the target schema carries any custom suffix.
+        Returns the statements in execution order.
+        """
+        # Redshift speaks the Postgres protocol but not its DDL, whichever dialect reached it
+        dialect = 'redshift' if self._is_redshift else self._get_dialect_name()
 
         if dialect == 'bigquery':
-            # BigQuery uses CREATE OR REPLACE TABLE ... AS SELECT
-            query = f"""
-                CREATE OR REPLACE TABLE `{target_full}`
-                AS SELECT * FROM `{source_full}`
-            """
-        elif dialect in ['postgresql', 'redshift']:
-            # Drop and create
-            query = f"""
-                DROP TABLE IF EXISTS {target_full};
-                CREATE TABLE {target_full} AS SELECT * FROM {source_full};
-            """
+            # Table clones are metadata-only: no bytes are scanned or billed
+            statements = [
+                f"CREATE OR REPLACE TABLE `{target_full}` CLONE `{source_full}`"
+            ]
+        elif dialect == 'snowflake':
+            # Zero-copy clone shares micro-partitions with the source
+            statements = [
+                f"CREATE OR REPLACE TABLE {target_full} CLONE {source_full}"
+            ]
+        elif dialect == 'postgresql':
+            # Create an empty clone of the source definition, then bulk insert.
+            # LIKE keeps defaults and constraints that CREATE TABLE AS would drop.
+            # `TABLE source` is shorthand for SELECT * without a projection list to resolve.
+            # The copy stays server-side; only the commit's WAL flush is skipped.
+            statements = [
+                self._ASYNC_COMMIT,
+                f"DROP TABLE IF EXISTS {target_full}",
+                f"CREATE TABLE {target_full} (LIKE {source_full} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)",
+                f"INSERT INTO {target_full} TABLE {source_full}",
+            ]
+        elif dialect == 'redshift':
+            # Redshift's LIKE only supports DEFAULTS, but also carries over dist/sort keys
+            statements = [
+                f"DROP TABLE IF EXISTS {target_full}",
+                f"CREATE TABLE {target_full} (LIKE {source_full} INCLUDING DEFAULTS)",
+                f"INSERT INTO {target_full} SELECT * FROM {source_full}",
+            ]
         elif dialect == 'trino':
             # Trino uses CREATE TABLE AS
-            query = f"""
-                DROP TABLE IF EXISTS {target_full};
-                CREATE TABLE {target_full} AS SELECT * FROM {source_full};
-            """
+            statements = [
+                f"DROP TABLE IF EXISTS {target_full}",
+                f"CREATE TABLE {target_full} AS SELECT * FROM {source_full}",
+            ]
         else:
             # Generic SQL - try standard approach
-            query = f"""
-                DROP TABLE IF EXISTS {target_full};
-                CREATE TABLE {target_full} AS SELECT * FROM {source_full};
-            """
+            statements = [
+                f"DROP TABLE IF EXISTS {target_full}",
+                f"CREATE TABLE {target_full} AS SELECT * FROM {source_full}",
+            ]
 
-        return query
+        return statements
 
-    def _copy_single_table(self, node: Dict[str, Any]) -> Dict[str, Any]:
+    def _build_stream_copy_query(
+        self,
+        source_relation: str,
+        target_full: str,
+        column_definitions: str
+    ) -> List[str]:
+        """
+        Build the statements for streaming a table from another Postgres database.
+        All but the last two run on the target, the COPY pair is piped between both connections.
+        """
+        return [
+            self._ASYNC_COMMIT,
+            f"DROP TABLE IF EXISTS {target_full}",
+            f"CREATE TABLE {target_full} ({column_definitions})",
+            f"COPY {source_relation} TO STDOUT (FORMAT binary)",
+            # The table was created in this transaction, so rows can be written already frozen
+            f"COPY {target_full} FROM STDIN (FORMAT binary, FREEZE)",
+        ]
+
+    def _fetch_column_definitions(self, source_conn: 'Connection', source_relation: str) -> str:
+        """Read a source table's column list as DDL, since LIKE cannot reference another database."""
+        rows = source_conn.execute(
+            text(
+                "SELECT a.attname, pg_catalog.format_type(a.atttypid, a.atttypmod), a.attnotnull "
+                "FROM pg_catalog.pg_attribute a "
+                "WHERE a.attrelid = CAST(:relation AS regclass) AND a.attnum > 0 AND NOT a.attisdropped "
+                "ORDER BY a.attnum"
+            ),
+            {'relation': source_relation}
+        ).fetchall()
+        if not rows:
+            raise ValueError(f"No columns found for {source_relation}")
+
+        return ", ".join(
+            '"{}" {}{}'.format(name.replace('"', '""'), column_type, " NOT NULL" if not_null else "")
+            for name, column_type, not_null in rows
+        )
+
+    def _execute_stream_copy(
+        self,
+        conn: 'Connection',
+        source_database: str,
+        source_relation: str,
+        target_full: str,
+        target_schema: str
+    ):
+        """
+        Copy a table from another database by piping COPY ... TO STDOUT on the source
+        into COPY ... FROM STDIN on the target, without buffering the table in memory.
+        """
+        self._create_schema_if_not_exists(target_schema, conn=conn)
+
+        with self._get_source_engine(source_database).connect() as source_conn:
+            column_definitions = self._fetch_column_definitions(source_conn, source_relation)
+            *setup, copy_out, copy_in = self._build_stream_copy_query(
+                source_relation, target_full, column_definitions
+            )
+
+            with conn.begin():
+                for statement in setup:
+                    conn.execute(text(statement))
+
+                read_fd, write_fd = os.pipe()
+                producer_errors = []
+
+                def produce():
+                    try:
+                        with os.fdopen(write_fd, 'wb') as sink:
+                            source_conn.connection.cursor().copy_expert(copy_out, sink)
+                    except Exception as e:
+                        producer_errors.append(e)
+
+                producer = threading.Thread(target=produce, daemon=True)
+                producer.start()
+                try:
+                    # Closing the read end on failure unblocks the producer with a broken pipe
+                    with os.fdopen(read_fd, 'rb') as stream:
+                        conn.connection.cursor().copy_expert(copy_in, stream)
+                except Exception:
+                    producer.join()
+                    # A failed source read shows up here as a truncated stream; report its cause
+                    if producer_errors and not isinstance(producer_errors[0], BrokenPipeError):
+                        raise producer_errors[0]
+                    raise
+                producer.join()
+
+                # A source failure can end the stream on a row boundary, which COPY accepts;
+                # raising here rolls the partial copy back
+                if producer_errors:
+                    raise producer_errors[0]
+
+    def _thread_connection(self) -> 'Connection':
+        """Return the calling thread's connection, checking one out of the pool on first use."""
+        conn = getattr(self._tls, 'conn', None)
+        if conn is None or conn.closed or conn.invalidated:
+            if conn is not None:
+                conn.close()
+            conn = self.engine.connect()
+            self._tls.conn = conn
+            with self._tls_conns_lock:
+                self._tls_conns.append(conn)
+        return conn
+
+    def _release_thread_connections(self):
+        """Return every per-thread connection to the pool."""
+        with self._tls_conns_lock:
+            conns, self._tls_conns = self._tls_conns, []
+        for conn in conns:
+            conn.close()
+
+    def _copy_with_conn(self, node: Dict[str, Any]) -> Dict[str, Any]:
+        """Copy a single table on the calling thread's connection."""
+        if self.dry_run:
+            return self._copy_single_table(node)
+        return self._copy_single_table(node, conn=self._thread_connection())
+
+    def _copy_single_table(self, node: Dict[str, Any], conn: Optional['Connection'] = None) -> Dict[str, Any]:
         """
         Copy a single table from production to CI schema.
+        If `conn` is given, all statements are executed on it.
         Returns a result dict with status information.
         """
         source_database = node.get('database')
@@ -166,119 +438,187 @@ class TableCopier:
         unique_id = node.get('unique_id')
         materialization = node.get('materialization', 'unknown')
 
-        # Compute target schema with preserved custom suffix
+        # Compute target schema with preserved custom suffix, and every name used below once
         target_schema = self._compute_target_schema(source_schema)
+        source_display = f"{source_schema}.{source_table}"
+        target_display = f"{target_schema}.{source_table}"
+        # Sources in another Postgres database are read over their own connection
+        stream_copy = self._is_cross_database(source_database) and self._supports_stream_copy()
+        source_full = source_display if stream_copy else self._qualify_source(source_database, source_display)
+
+        result = {
+            'unique_id': unique_id,
+            'source': source_display,
+            'target': target_display,
+        }
 
         if self.dry_run:
             # Dry-run mode: just log what would be copied
-            logger.info(f"[DRY RUN] Would copy: {source_schema}.{source_table} -> {target_schema}.{source_table} (type: {materialization})")
+            logger.info("[DRY RUN] Would copy: %s -> %s (type: %s)", source_display, target_display, materialization)
 
-            query = self._build_copy_query(
-                source_database=source_database,
-                source_schema=source_schema,
-                source_table=source_table,
-                target_table=source_table
-            )
+            if stream_copy:
+                statements = self._build_stream_copy_query(
+                    source_full, target_display,
+                    f"<columns of {source_database}.{source_full}>"
+                )
+            else:
+                statements = self._build_copy_query(source_full, target_display)
 
-            return {
-                'unique_id': unique_id,
-                'source': f"{source_schema}.{source_table}",
-                'target': f"{target_schema}.{source_table}",
+            result.update({
                 'materialization': materialization,
                 'status': 'dry_run',
                 'error': None,
-                'query': query.strip()
-            }
+                'query': ";\n".join(statements)
+            })
+            return result
 
-        logger.info(f"Copying table: {source_schema}.{source_table} -> {target_schema}.{source_table}")
+        logger.info("Copying table: %s -> %s", source_display, target_display)
 
         try:
-            query = self._build_copy_query(
-                source_database=source_database,
-                source_schema=source_schema,
-                source_table=source_table,
-                target_table=source_table
-            )
+            if stream_copy:
+                copy = partial(
+                    self._execute_stream_copy,
+                    source_database=source_database,
+                    source_relation=source_full,
+                    target_full=target_display,
+                    target_schema=target_schema
+                )
+            else:
+                copy = partial(
+                    self._execute_copy,
+                    statements=self._build_copy_query(source_full, target_display),
+                    target_schema=target_schema
+                )
+
+            if conn is None:
+                with self.engine.connect() as conn:
+                    copy(conn)
+            else:
+                copy(conn)
 
-            with self.engine.connect() as conn:
-                # For dialects that need statement splitting
-                dialect = self._get_dialect_name()
-
-                if dialect in ['postgresql', 'redshift', 'trino']:
-                    # Execute statements separately
-                    statements = [s.strip() for s in query.split(';') if s.strip()]
-                    for statement in statements:
-                        conn.execute(text(statement))
-                else:
-                    # Execute as single query
-                    conn.execute(text(query))
-
-            logger.info(f"Successfully copied {source_schema}.{source_table}")
-            return {
-                'unique_id': unique_id,
-                'source': f"{source_schema}.{source_table}",
-                'target': f"{target_schema}.{source_table}",
-                'status': 'success',
-                'error': None
-            }
+            logger.info("Successfully copied %s", source_display)
+            result.update({'status': 'success', 'error': None})
+            return result
 
         except Exception as e:
-            logger.error(f"Failed to copy {source_schema}.{source_table}: {e}")
-            return {
-                'unique_id': unique_id,
-                'source': f"{source_schema}.{source_table}",
-                'target': f"{target_schema}.{source_table}",
-                'status': 'failed',
-                'error': str(e)
-            }
+            logger.error("Failed to copy %s: %s", source_display, e)
+            result.update({'status': 'failed', 'error': str(e)})
+            return result
+
+    def _execute_copy(self, conn: 'Connection', statements: List[str], target_schema: str):
+        """Ensure the target schema exists and run the copy statements on an open connection."""
+        self._create_schema_if_not_exists(target_schema, conn=conn)
+
+        # Run the whole sequence in a single transaction so it commits once
+        with conn.begin():
+            for statement in statements:
+                conn.execute(text(statement))
+
+    def _ensure_node_schema(self, node: Dict[str, Any]):
+        """Create the target schema of a single node if it has not been created yet."""
+        if node.get('schema'):
+            self.ensure_schemas([self._compute_target_schema(node['schema'])])
 
-    def copy_tables(self, nodes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def copy_tables(self, nodes: Iterable[Dict[str, Any]], fail_fast: bool = False) -> List[Dict[str, Any]]:
         """
         Copy multiple tables using parallel threads.
+        `nodes` may be any iterable; when it is not a list, each copy starts as soon
+        as its node is produced instead of after the whole input is known.
+        With `fail_fast`, copies that have not started yet are cancelled after the first failure.
         Returns a list of result dicts.
         """
-        if not nodes:
-            logger.info("No tables to copy")
-            return []
-
-        # Create all required schemas sequentially before any parallel work
-        self._ensure_schemas(nodes)
+        streaming = not isinstance(nodes, list)
+
+        if not streaming:
+            if not nodes:
+                logger.info("No tables to copy")
+                return []
+
+            # Create all required schemas sequentially before any parallel work
+            target_schemas = {
+                self._compute_target_schema(node['schema'])
+                for node in nodes
+                if node.get('schema')
+            }
+            self.ensure_schemas(target_schemas)
 
         results = []
+        total = 0
 
-        if self.threads == 1:
-            # Sequential execution
-            for node in nodes:
-                result = self._copy_single_table(node)
-                results.append(result)
-        else:
-            # Parallel execution
-            logger.info(f"Copying {len(nodes)} tables using {self.threads} threads")
-
-            with ThreadPoolExecutor(max_workers=self.threads) as executor:
-                # Submit all tasks
-                future_to_node = {
-                    executor.submit(self._copy_single_table, node): node
-                    for node in nodes
-                }
-
-                # Collect results as they complete
-                for future in as_completed(future_to_node):
-                    result = future.result()
+        try:
+            if self.threads == 1:
+                # Sequential execution
+                remaining = iter(nodes)
+                for node in remaining:
+                    total += 1
+                    if streaming:
+                        self._ensure_node_schema(node)
+                    result = self._copy_with_conn(node)
                     results.append(result)
+                    if fail_fast and result['status'] == 'failed':
+                        # Count the nodes that will not be copied, so they are reported as skipped
+                        total += sum(1 for _ in remaining)
+                        break
+            else:
+                # Parallel execution
+                if streaming:
+                    logger.info("Copying tables using %s threads", self.threads)
+                else:
+                    logger.info("Copying %s tables using %s threads", len(nodes), self.threads)
+
+                with ThreadPoolExecutor(max_workers=self.threads) as executor:
+                    # Submit each task as soon as its node is known
+                    # Each worker reuses its own connection for every table it copies
+                    futures = []
+                    for node in nodes:
+                        total += 1
+                        if streaming:
+                            # Schemas are created on this thread, before any copy into them starts
+                            self._ensure_node_schema(node)
+                        futures.append(executor.submit(partial(self._copy_with_conn, node)))
+
+                    # Collect results as they complete
+                    cancelled = False
+                    for future in as_completed(futures):
+                        if future.cancelled():
+                            continue
+                        result = future.result()
+                        results.append(result)
+
+                        if fail_fast and result['status'] == 'failed' and not cancelled:
+                            # Only copies that have not started are cancelled; running ones finish
+                            # and are still reported. The workers drain the cancelled futures,
+                            # which is what lets as_completed() observe them.
+                            for pending in futures:
+                                pending.cancel()
+                            cancelled = True
+        finally:
+            # The worker threads are gone; hand their connections back to the pool
+            self._release_thread_connections()
+
+        if not total:
+            logger.info("No tables to copy")
+            return []
 
         # Log summary
         if self.dry_run:
             dry_run_count = sum(1 for r in results if r['status'] == 'dry_run')
-            logger.info(f"[DRY RUN] Would copy {dry_run_count} tables")
+            logger.info("[DRY RUN] Would copy %s tables", dry_run_count)
         else:
             successful = sum(1 for r in results if r['status'] == 'success')
             failed = sum(1 for r in results if r['status'] == 'failed')
-            logger.info(f"Copy complete: {successful} successful, {failed} failed")
+            logger.info("Copy complete: %s successful, %s failed", successful, failed)
+
+            skipped = total - len(results)
+            if skipped:
+                logger.warning("Skipped %s tables after the first failure (fail-fast)", skipped)
 
         return results
 
     def close(self):
-        """Close database connection."""
+        """Close database connections."""
+        self._release_thread_connections()
         if self.engine:
             self.engine.dispose()
+        for engine in self._source_engines.values():
+            engine.dispose()
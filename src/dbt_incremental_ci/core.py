@@ -1,14 +1,45 @@
+import asyncio
 import logging
+import os
+import stat
 import tempfile
-from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Set
 
-from .dbt_helper import DbtHelper
+from .dbt_helper import DbtHelper, clear_manifest_cache
 from .copier import TableCopier
-from .dbt_cloud import DbtCloudClient
+from .dbt_cloud import DEFAULT_CACHE_DIR, DbtCloudClient
 
 logger = logging.getLogger(__name__)
 
 
+def _manifest_cache_root(cache_dir: Optional[str] = None) -> str:
+    """
+    Directory for manifests downloaded from dbt Cloud, private to the current user.
+    `cache_dir` is used when it can be created; otherwise a per-user directory in the
+    temp directory is. A shared temp directory lets other users pre-create predictable
+    paths, so a root there that isn't a directory owned by this user is replaced by a
+    fresh private one.
+    """
+    if cache_dir:
+        root = os.path.expanduser(cache_dir)
+        try:
+            os.makedirs(root, mode=0o700, exist_ok=True)
+            return root
+        except OSError as e:
+            logger.warning(f"Not using manifest cache {root}: {e}")
+
+    user = os.getuid() if hasattr(os, 'getuid') else os.getlogin()
+    root = os.path.join(tempfile.gettempdir(), f"dbt-incremental-ci-{user}")
+    os.makedirs(root, mode=0o700, exist_ok=True)
+
+    st = os.lstat(root)
+    if not stat.S_ISDIR(st.st_mode) or (hasattr(os, 'getuid') and st.st_uid != os.getuid()):
+        logger.warning(f"Not using manifest cache {root}: not a directory owned by this user")
+        return tempfile.mkdtemp(prefix="dbt-incremental-ci-")
+    return root
+
+
 class DbtIncrementalCI:
     """
     Main class for dbt incremental CI workflow.
@@ -28,10 +59,14 @@ class DbtIncrementalCI:
         dbt_cloud_token: Optional[str] = None,
         dbt_cloud_account_id: Optional[str] = None,
         dbt_cloud_job_id: Optional[str] = None,
-        dbt_cloud_run_id: Optional[str] = None,
+        dbt_cloud_run_id: Optional[int] = None,
         base_schema: Optional[str] = None,
         threads: int = 1,
-        dry_run: bool = False
+        dry_run: bool = False,
+        cache_manifest: bool = True,
+        cache_dir: Optional[str] = DEFAULT_CACHE_DIR,
+        fail_fast: bool = False,
+        use_dbt_runner: bool = True
     ):
         """
         Initialize DbtIncrementalCI.
@@ -48,6 +83,13 @@ class DbtIncrementalCI:
             base_schema: Production base schema name (will be auto-detected from manifest if not provided)
             threads: Number of parallel threads for copying tables
             dry_run: If True, only show what would be copied without actually copying
+            cache_manifest: If True, keep the dbt Cloud manifest on disk after cleanup so
+                later runs can skip the download when it is unchanged
+            cache_dir: Directory the dbt Cloud manifest is cached in, keyed by job and run ID
+                (None uses a per-user directory in the temp directory)
+            fail_fast: If True, stop starting new table copies after the first failure
+            use_dbt_runner: If True, run dbt ls in-process when dbt-core is importable;
+                if False, always run the `dbt` executable on PATH
         """
         self.dbt_project_dir = dbt_project_dir
         self.database_uri = database_uri
@@ -55,7 +97,10 @@ class DbtIncrementalCI:
         self.base_schema = base_schema
         self.threads = threads
         self.dry_run = dry_run
+        self.fail_fast = fail_fast
         self._temp_manifest_path = None
+        self._cache_manifest = cache_manifest
+        self._cache_dir = cache_dir
 
         # Determine manifest source
         if prod_manifest_path:
@@ -79,14 +124,12 @@ class DbtIncrementalCI:
 
         self.dbt_helper = DbtHelper(
             dbt_project_dir=dbt_project_dir,
-            prod_manifest_path=self.prod_manifest_path
+            prod_manifest_path=self.prod_manifest_path,
+            use_dbt_runner=use_dbt_runner
         )
 
-        # Auto-detect base schema if not provided
-        if not self.base_schema:
-            self.base_schema = self._detect_base_schema()
-            logger.info(f"Auto-detected base schema: {self.base_schema}")
-
+        # A missing base schema is auto-detected in run(), while dbt ls is running,
+        # so constructing the workflow doesn't parse the production manifest
         self.copier = TableCopier(
             database_uri=database_uri,
             ci_schema=ci_schema,
@@ -103,30 +146,29 @@ class DbtIncrementalCI:
         Returns:
             The detected base schema name, or None if not found
         """
-        manifest = self.dbt_helper.prod_manifest
+        manifest = self.dbt_helper.prod_manifest_projection
         nodes = manifest.get('nodes', {})
-
-        # Find any model without a custom schema config
-        for node_key, node in nodes.items():
-            if node.get('resource_type') == 'model':
-                custom_schema = node.get('config', {}).get('schema')
-                if not custom_schema:
-                    # This model has no custom schema, so its schema is the base schema
-                    base_schema = node.get('schema')
-                    if base_schema:
-                        return base_schema
-
-        # Fallback: if all models have custom schemas, try to infer from the first model
-        # by removing the custom suffix
-        for node_key, node in nodes.items():
-            if node.get('resource_type') == 'model':
-                schema = node.get('schema')
-                custom_schema = node.get('config', {}).get('schema')
-                if schema and custom_schema:
-                    # Remove custom suffix (assuming it's appended with underscore)
-                    if schema.endswith(f"_{custom_schema}"):
-                        base_schema = schema[:-len(f"_{custom_schema}")]
-                        return base_schema
+        fallback_schema = None
+
+        # Single pass: return as soon as a model without a custom schema config is found,
+        # while remembering a fallback in case every model has a custom schema
+        for node in nodes.values():
+            get = node.get
+            if get('resource_type') != 'model':
+                continue
+
+            schema = get('schema')
+            custom_schema = get('config', {}).get('schema')
+            if not custom_schema:
+                # This model has no custom schema, so its schema is the base schema
+                if schema:
+                    return schema
+            elif fallback_schema is None and schema and schema.endswith(f"_{custom_schema}"):
+                # Remove custom suffix (assuming it's appended with underscore)
+                fallback_schema = schema[:-len(f"_{custom_schema}")]
+
+        if fallback_schema:
+            return fallback_schema
 
         logger.warning("Could not auto-detect base schema from manifest")
         return None
@@ -136,10 +178,12 @@ class DbtIncrementalCI:
         api_token: str,
         account_id: str,
         job_id: str,
-        run_id: Optional[str] = None
+        run_id: Optional[int] = None
     ) -> str:
         """
-        Fetch manifest from dbt Cloud and save to temporary file.
+        Fetch manifest from dbt Cloud and save it to a per-user cache file.
+        A run's artifacts never change, so a manifest already cached for the resolved run
+        is used without contacting the server again.
 
         Args:
             api_token: dbt Cloud API token
@@ -148,20 +192,70 @@ class DbtIncrementalCI:
             run_id: Optional specific run ID
 
         Returns:
-            Path to temporary manifest file
+            Path to cached manifest file
         """
-        client = DbtCloudClient(api_token, account_id)
+        with DbtCloudClient(api_token, account_id) as client:
+            resolved_run_id = client.resolve_run_id(job_id, run_id)
 
-        # Create temporary file for manifest
+            # dbt's --state expects a file named manifest.json, so the cache key goes in the directory
+            run_dir = os.path.join(_manifest_cache_root(self._cache_dir), str(job_id), str(resolved_run_id))
+            temp_path = os.path.join(run_dir, 'manifest.json')
 
-        temp_path = 'manifest.json'
+            if os.path.exists(temp_path):
+                logger.info(f"Using cached manifest for run {resolved_run_id}: {temp_path}")
+            else:
+                # Downloads land in a .part file first, so an existing manifest.json is complete
+                client.save_manifest_to_file(job_id, temp_path, resolved_run_id)
 
-        # Save manifest to temp file
-        client.save_manifest_to_file(job_id, temp_path, run_id)
         self._temp_manifest_path = temp_path
 
         return temp_path
 
+    def _precreate_ci_schema(self):
+        """Create the CI base schema ahead of copying; failures are left for the copy step."""
+        try:
+            self.copier.ensure_schemas([self.ci_schema])
+        except Exception as e:
+            logger.warning(f"Could not pre-create CI schema {self.ci_schema}: {e}")
+
+    def _resolve_base_schema(self):
+        """Auto-detect the base schema from the production manifest if it wasn't provided."""
+        if self.base_schema:
+            return
+        self.base_schema = self._detect_base_schema()
+        self.copier.base_schema = self.base_schema
+        logger.info(f"Auto-detected base schema: {self.base_schema}")
+
+    async def _detect_modified_nodes(self) -> Set[str]:
+        """
+        Run dbt ls while, on worker threads, the CI base schema is created and the
+        production manifest is parsed to resolve the base schema.
+        """
+        side_tasks = [
+            asyncio.ensure_future(asyncio.to_thread(self._precreate_ci_schema)),
+            asyncio.ensure_future(asyncio.to_thread(self._resolve_base_schema)),
+        ]
+        try:
+            return await self.dbt_helper.get_modified_nodes_async()
+        finally:
+            await asyncio.gather(*side_tasks)
+
+    def _detect_modified_nodes_in_threads(self) -> Set[str]:
+        """
+        Same as `_detect_modified_nodes`, for callers already inside an event loop
+        (e.g. Jupyter), where asyncio.run() cannot start a new one.
+        """
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            side_tasks = [
+                executor.submit(self._precreate_ci_schema),
+                executor.submit(self._resolve_base_schema),
+            ]
+            try:
+                return self.dbt_helper.get_modified_nodes()
+            finally:
+                for task in side_tasks:
+                    task.result()
+
     def run(self) -> Dict[str, Any]:
         """
         Execute the full CI workflow.
@@ -174,9 +268,14 @@ class DbtIncrementalCI:
         """
         logger.info("Starting dbt incremental CI workflow")
 
-        # Step 1: Get modified nodes
+        # Step 1: Get modified nodes (the CI schema is created while dbt parses the project)
         logger.info("Step 1: Detecting modified nodes")
-        modified_nodes = self.dbt_helper.get_modified_nodes()
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            modified_nodes = asyncio.run(self._detect_modified_nodes())
+        else:
+            modified_nodes = self._detect_modified_nodes_in_threads()
 
         if not modified_nodes:
             logger.info("No modified nodes found, nothing to copy")
@@ -187,10 +286,12 @@ class DbtIncrementalCI:
             }
 
         # Step 2: Filter for incremental models and snapshots
+        # The filter is consumed by the copier, so copies start while later nodes are still matched
         logger.info("Step 2: Filtering for incremental models and snapshots")
-        filtered_nodes = self.dbt_helper.filter_incremental_and_snapshots(modified_nodes)
+        node_iter = self.dbt_helper.iter_incremental_and_snapshots(modified_nodes)
+        first_node = next(node_iter, None)
 
-        if not filtered_nodes:
+        if first_node is None:
             logger.info("No incremental models or snapshots found in modified nodes")
             return {
                 'modified_nodes': modified_nodes,
@@ -198,13 +299,23 @@ class DbtIncrementalCI:
                 'copy_results': []
             }
 
+        filtered_nodes = [first_node]
+
+        def stream_nodes():
+            yield first_node
+            for node in node_iter:
+                filtered_nodes.append(node)
+                yield node
+
         # Step 3: Copy tables to CI schema (or dry-run)
         if self.dry_run:
             logger.info("Step 3: DRY RUN - Showing tables that would be copied")
         else:
             logger.info("Step 3: Copying tables to CI schema")
 
-        copy_results = self.copier.copy_tables(filtered_nodes)
+        copy_results = self.copier.copy_tables(stream_nodes(), fail_fast=self.fail_fast)
+        # A fail-fast stop can leave nodes unread; the summary still reports every match
+        filtered_nodes.extend(node_iter)
 
         if self.dry_run:
             logger.info("DRY RUN completed - no tables were actually copied")
@@ -217,13 +328,20 @@ class DbtIncrementalCI:
             'copy_results': copy_results
         }
 
-    def cleanup(self):
-        """Clean up resources."""
+    def cleanup(self, clear_cache: bool = False):
+        """
+        Clean up resources.
+
+        Args:
+            clear_cache: If True, also drop parsed manifests from the process-level cache
+        """
         self.copier.close()
 
-        # Clean up temporary manifest file if it was created
-        if self._temp_manifest_path:
-            import os
+        if clear_cache:
+            clear_manifest_cache()
+
+        # Clean up temporary manifest file if it was created and is not kept as a cache
+        if self._temp_manifest_path and not self._cache_manifest:
             try:
                 os.unlink(self._temp_manifest_path)
                 logger.debug(f"Removed temporary manifest: {self._temp_manifest_path}")
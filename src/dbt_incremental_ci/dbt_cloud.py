@@ -1,38 +1,155 @@
 import json
 import logging
+import os
+import shutil
+import threading
 import requests
-from typing import Dict, Any, Optional
+from collections import OrderedDict
+from itertools import chain
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from requests.adapters import HTTPAdapter
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 from pathlib import Path
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
 
 logger = logging.getLogger(__name__)
 
+# Chunk size used when streaming artifacts to disk
+DOWNLOAD_CHUNK_SIZE = 1 << 20
+
+# Number of parsed manifests each client keeps in memory
+MANIFEST_CACHE_SIZE = 4
+
+# Where downloaded run artifacts are kept between runs, unless told otherwise
+DEFAULT_CACHE_DIR = "~/.cache/dbt-incremental-ci"
+
+
+def _loads(content: bytes) -> Any:
+    """Parse a JSON response body, using orjson when it is installed."""
+    return orjson.loads(content) if orjson else json.loads(content)
+
+
+def _read_body(response: requests.Response, chunks: Iterator[bytes]) -> bytearray:
+    """
+    Read a streamed response body, given as its DOWNLOAD_CHUNK_SIZE chunks, into a single buffer.
+
+    The buffer is presized from Content-Length when the body is not content-encoded, so
+    the payload is held once instead of as a list of chunks plus their joined copy.
+    """
+    encoded = response.headers.get("Content-Encoding", "identity") != "identity"
+    expected = 0 if encoded else int(response.headers.get("Content-Length") or 0)
+    buffer = bytearray(expected)
+    offset = 0
+    for chunk in chunks:
+        end = offset + len(chunk)
+        # Fills the presized buffer in place; a slice past its end grows it instead
+        buffer[offset:end] = chunk
+        offset = end
+    del buffer[offset:]
+    return buffer
+
+
+def _close_response(future: Future):
+    """Done-callback that releases the connection of a response nobody will read."""
+    if not future.cancelled() and future.exception() is None:
+        response, _ = future.result()
+        response.close()
+
 
 class DbtCloudClient:
     """Client for interacting with dbt Cloud API."""
 
-    def __init__(self, api_token: str, account_id: str):
+    def __init__(
+        self,
+        api_token: str,
+        account_id: str,
+        cache_dir: Optional[str] = None,
+        retries: int = 6,
+        backoff_factor: float = 0.5,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 60.0,
+        hedge_delay: Optional[float] = 5.0
+    ):
         """
         Initialize dbt Cloud API client.
 
         Args:
             api_token: dbt Cloud API token
             account_id: dbt Cloud account ID
+            cache_dir: Optional directory for caching run artifacts on disk
+                (e.g. ~/.cache/dbt-incremental-ci). Stored as msgpack when it is installed.
+            retries: Maximum number of retries for transient connection errors and 408/425/429/5xx
+                responses (0 disables retrying)
+            backoff_factor: Base of the exponential backoff between retries, in seconds
+            connect_timeout: Seconds to wait for a connection to the API
+            read_timeout: Seconds to wait for data on an open connection before giving up
+            hedge_delay: Seconds after which a slow artifact download is raced by a duplicate
+                request (None disables hedging)
         """
         self.api_token = api_token
         self.account_id = account_id
+        self.cache_dir = Path(cache_dir).expanduser() if cache_dir else None
+        # A stalled socket is aborted (and retried) instead of hanging the CI job
+        self._timeout = (connect_timeout, read_timeout)
+        self.hedge_delay = hedge_delay
         self.base_url = "https://cloud.getdbt.com/api/v2"
         self.headers = {
             "Authorization": f"Token {api_token}",
             "Content-Type": "application/json"
         }
 
-    def get_job_runs(self, job_id: str, limit: int = 10) -> Dict[str, Any]:
+        # Reuse connections across calls so only the first request pays for the TLS handshake
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        retry = Retry(
+            total=retries,
+            connect=min(retries, 3),
+            read=min(retries, 3),
+            status=min(retries, 5),
+            backoff_factor=backoff_factor,
+            respect_retry_after_header=True,
+            status_forcelist=[408, 425, 429, 500, 502, 503, 504],
+            allowed_methods=frozenset(["GET", "HEAD"]),
+            # Hand the last response back so callers see the usual HTTPError
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=50, max_retries=retry)
+        self.session.mount("https://", adapter)
+
+        # Parsed manifests keyed by (account_id, job_id, run_id), least recently used first
+        self._manifest_cache: "OrderedDict[Tuple[str, str, str], Dict[str, Any]]" = OrderedDict()
+        self._manifest_cache_lock = threading.Lock()
+        # Latest successful run per job, looked up at most once per client
+        self._latest_run_cache: Dict[str, Dict[str, Any]] = {}
+
+    def close(self):
+        """Close pooled HTTP connections."""
+        self.session.close()
+
+    def __enter__(self) -> "DbtCloudClient":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def get_job_runs(self, job_id: str, limit: int = 10, status: Optional[int] = None) -> Dict[str, Any]:
         """
         Get recent runs for a job.
 
         Args:
             job_id: dbt Cloud job ID
             limit: Maximum number of runs to fetch
+            status: Optional run status to filter on server-side (e.g. 10 for success)
 
         Returns:
             API response with job runs
@@ -43,12 +160,14 @@ class DbtCloudClient:
             "limit": limit,
             "order_by": "-finished_at"  # Most recent first
         }
+        if status is not None:
+            params["status"] = status
 
         logger.info(f"Fetching runs for job {job_id}")
-        response = requests.get(url, headers=self.headers, params=params)
+        response = self.session.get(url, params=params, timeout=self._timeout)
         response.raise_for_status()
 
-        return response.json()
+        return _loads(response.content)
 
     def get_latest_successful_run(self, job_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -72,7 +191,94 @@ class DbtCloudClient:
         logger.warning(f"No successful runs found for job {job_id}")
         return None
 
-    def get_run_artifact(self, run_id: str, artifact_path: str) -> Dict[str, Any]:
+    def get_latest_successful_run_fast(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the latest successful run for a job with a single server-filtered lookup.
+
+        Falls back to scanning recent runs if the API rejects or ignores the status filter.
+        The result is remembered for the lifetime of the client.
+
+        Args:
+            job_id: dbt Cloud job ID
+
+        Returns:
+            Run metadata dict or None if no successful run found
+        """
+        cached = self._latest_run_cache.get(str(job_id))
+        if cached is not None:
+            return cached
+
+        try:
+            runs = self.get_job_runs(job_id, limit=1, status=10).get("data", [])
+        except requests.HTTPError as e:
+            logger.debug(f"Status-filtered run lookup failed for job {job_id}, scanning runs: {e}")
+            run = self.get_latest_successful_run(job_id)
+        else:
+            if not runs:
+                logger.warning(f"No successful runs found for job {job_id}")
+                return None
+            run = runs[0]
+            if run.get("status") == 10:
+                logger.info(f"Found successful run: {run.get('id')} (finished at {run.get('finished_at')})")
+            else:
+                # The filter was ignored, so the newest run is not necessarily a successful one
+                run = self.get_latest_successful_run(job_id)
+
+        if run is not None:
+            self._latest_run_cache[str(job_id)] = run
+        return run
+
+    def resolve_run_id(self, job_id: str, run_id: Optional[int] = None) -> int:
+        """
+        Resolve the run to fetch artifacts from.
+
+        Args:
+            job_id: dbt Cloud job ID
+            run_id: Optional specific run ID. If not provided, uses latest successful run.
+
+        Returns:
+            The given run ID, or the ID of the job's latest successful run
+        """
+        if run_id is not None:
+            return int(run_id)
+
+        run = self.get_latest_successful_run_fast(job_id)
+        if not run:
+            raise ValueError(f"No successful run found for job {job_id}")
+        return run["id"]
+
+    def check_run_artifact(
+        self,
+        run_id: int,
+        artifact_path: str,
+        etag: Optional[str] = None
+    ) -> Tuple[bool, Optional[str]]:
+        """
+        Check whether an artifact changed since it was last downloaded, without fetching it.
+
+        Args:
+            run_id: dbt Cloud run ID
+            artifact_path: Path to artifact (e.g., 'manifest.json')
+            etag: ETag recorded when the artifact was last downloaded
+
+        Returns:
+            Tuple of (modified, etag). `modified` is False only when the server confirms
+            the cached copy is current; `etag` is the artifact's current ETag, if any.
+        """
+        url = f"{self.base_url}/accounts/{self.account_id}/runs/{run_id}/artifacts/{artifact_path}"
+        headers = {"If-None-Match": etag} if etag else None
+
+        response = self.session.head(url, headers=headers, allow_redirects=True, timeout=self._timeout)
+        if response.status_code == 304:
+            return False, etag
+        if not response.ok:
+            # Validation is best-effort; fall back to a full download
+            logger.debug(f"Could not validate artifact {artifact_path} (HTTP {response.status_code})")
+            return True, None
+
+        return True, response.headers.get("ETag")
+
+    def get_run_artifact(self, run_id: int, artifact_path: str) -> Dict[str, Any]:
         """
         Get an artifact from a specific run.
 
@@ -83,15 +289,138 @@ class DbtCloudClient:
         Returns:
             Artifact contents as dict
         """
+        cache_path = self._artifact_cache_path(run_id, artifact_path)
+        if cache_path is not None and cache_path.exists():
+            try:
+                artifact = self._read_cached_artifact(cache_path)
+                logger.info(f"Using cached artifact {artifact_path} from run {run_id}")
+                return artifact
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable cached artifact {cache_path}: {e}")
+
         url = f"{self.base_url}/accounts/{self.account_id}/runs/{run_id}/artifacts/{artifact_path}"
 
         logger.info(f"Fetching artifact {artifact_path} from run {run_id}")
-        response = requests.get(url, headers=self.headers)
-        response.raise_for_status()
+        response, chunks = self._start_hedged(url)
+        with response:
+            content = _read_body(response, chunks)
+        artifact = _loads(content)
+        if cache_path is not None:
+            try:
+                self._write_cached_artifact(cache_path, artifact, content)
+            except OSError as e:
+                logger.warning(f"Could not cache artifact {artifact_path}: {e}")
+
+        return artifact
+
+    def _start_hedged(self, url: str) -> Tuple[requests.Response, Iterator[bytes]]:
+        """
+        Stream a GET until the first chunk of its body arrives, racing a duplicate request
+        if that takes longer than `hedge_delay`. A straggler shows up as a slow start, so
+        only time to first chunk is raced; the winner then downloads the rest alone and
+        the other response is closed whenever it completes.
 
-        return response.json()
+        Returns the response and an iterator over all of its body chunks.
+        """
+        def start() -> Tuple[requests.Response, Iterator[bytes]]:
+            response = self.session.get(url, stream=True, timeout=self._timeout)
+            try:
+                response.raise_for_status()
+                chunks = response.iter_content(DOWNLOAD_CHUNK_SIZE)
+                first = next(chunks, b"")
+            except Exception:
+                response.close()
+                raise
+            return response, chain((first,), chunks)
+
+        if self.hedge_delay is None:
+            return start()
+
+        executor = ThreadPoolExecutor(max_workers=2)
+        try:
+            futures = [executor.submit(start)]
+            done, _ = wait(futures, timeout=self.hedge_delay)
+            if not done:
+                logger.info(f"No data after {self.hedge_delay}s, sending a hedged request")
+                futures.append(executor.submit(start))
+
+            errors = []
+            pending = set(futures)
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                winner = next((future for future in done if future.exception() is None), None)
+                if winner is not None:
+                    for other in futures:
+                        if other is not winner:
+                            other.add_done_callback(_close_response)
+                    return winner.result()
+                errors.extend(future.exception() for future in done)
+
+            raise errors[0]
+        finally:
+            # Don't wait for the losing request; its callback closes it
+            executor.shutdown(wait=False)
+
+    def _artifact_cache_path(self, run_id: int, artifact_path: str) -> Optional[Path]:
+        """Return where an artifact is cached on disk, or None if disk caching is off."""
+        if self.cache_dir is None:
+            return None
+        # Artifacts of a run never change, so the run ID alone keys the cache
+        name = artifact_path.replace("/", "_")
+        suffix = "msgpack" if msgpack else "json"
+        return self.cache_dir / f"{run_id}-{name}.{suffix}"
+
+    def _read_cached_artifact(self, cache_path: Path) -> Dict[str, Any]:
+        """Load an artifact written by `_write_cached_artifact`."""
+        data = cache_path.read_bytes()
+        if cache_path.suffix == ".msgpack":
+            return msgpack.unpackb(data, raw=False)
+        return _loads(data)
+
+    def _write_cached_artifact(self, cache_path: Path, artifact: Dict[str, Any], content: bytes):
+        """Atomically write an artifact to the disk cache."""
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        data = msgpack.packb(artifact) if cache_path.suffix == ".msgpack" else content
+
+        partial_file = cache_path.with_name(f"{cache_path.name}.part")
+        partial_file.write_bytes(data)
+        os.replace(partial_file, cache_path)
+
+    def get_run_artifact_raw(self, run_id: int, artifact_path: str, dest_path: str) -> str:
+        """
+        Download an artifact from a specific run straight to a file, without parsing it.
 
-    def get_manifest_from_job(self, job_id: str, run_id: Optional[str] = None) -> Dict[str, Any]:
+        Args:
+            run_id: dbt Cloud run ID
+            artifact_path: Path to artifact (e.g., 'manifest.json')
+            dest_path: Path where to save the artifact
+
+        Returns:
+            Path to saved artifact file
+        """
+        url = f"{self.base_url}/accounts/{self.account_id}/runs/{run_id}/artifacts/{artifact_path}"
+
+        dest_file = Path(dest_path)
+        dest_file.parent.mkdir(parents=True, exist_ok=True)
+        # Download next to the target so a failed transfer never leaves a truncated artifact
+        partial_file = dest_file.with_name(f"{dest_file.name}.part")
+
+        logger.info(f"Downloading artifact {artifact_path} from run {run_id}")
+        try:
+            with self.session.get(url, stream=True, timeout=self._timeout) as response:
+                response.raise_for_status()
+                # Undo any Content-Encoding while copying the raw body in fixed-size chunks
+                response.raw.decode_content = True
+                with open(partial_file, 'wb') as f:
+                    shutil.copyfileobj(response.raw, f, length=DOWNLOAD_CHUNK_SIZE)
+            os.replace(partial_file, dest_file)
+        finally:
+            if partial_file.exists():
+                partial_file.unlink()
+
+        return str(dest_file)
+
+    def get_manifest_from_job(self, job_id: str, run_id: Optional[int] = None) -> Dict[str, Any]:
         """
         Get manifest.json from a job's latest successful run or a specific run.
 
@@ -102,28 +431,67 @@ class DbtCloudClient:
         Returns:
             manifest.json contents as dict
         """
-        if run_id:
+        if run_id is not None:
             logger.info(f"Fetching manifest from specific run {run_id}")
         else:
             logger.info(f"Fetching manifest from latest successful run of job {job_id}")
-            run = self.get_latest_successful_run(job_id)
-            if not run:
-                raise ValueError(f"No successful run found for job {job_id}")
-            run_id = str(run.get("id"))
+        run_id = self.resolve_run_id(job_id, run_id)
+
+        # A run's artifacts never change, so a resolved run can be served from memory
+        cache_key = (str(self.account_id), str(job_id), run_id)
+        with self._manifest_cache_lock:
+            manifest = self._manifest_cache.get(cache_key)
+            if manifest is not None:
+                self._manifest_cache.move_to_end(cache_key)
+        if manifest is not None:
+            logger.info(f"Using cached manifest for run {run_id}")
+            return manifest
 
         manifest = self.get_run_artifact(run_id, "manifest.json")
         logger.info("Successfully fetched manifest from dbt Cloud")
+
+        with self._manifest_cache_lock:
+            self._manifest_cache[cache_key] = manifest
+            if len(self._manifest_cache) > MANIFEST_CACHE_SIZE:
+                self._manifest_cache.popitem(last=False)
         return manifest
 
+    def fetch_manifests(
+        self,
+        jobs: List[Tuple[str, Optional[int]]],
+        max_workers: int = 8
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Get manifest.json for several jobs concurrently over the shared session.
+
+        Args:
+            jobs: List of (job_id, run_id) pairs; run_id may be None for the latest successful run
+            max_workers: Maximum number of jobs fetched at the same time
+
+        Returns:
+            Dict mapping each job ID to its manifest.json contents
+        """
+        if not jobs:
+            return {}
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(jobs))) as executor:
+            futures = {
+                job_id: executor.submit(self.get_manifest_from_job, job_id, run_id)
+                for job_id, run_id in jobs
+            }
+            return {job_id: future.result() for job_id, future in futures.items()}
+
     def save_manifest_to_file(
         self,
         job_id: str,
         output_path: str,
-        run_id: Optional[str] = None
+        run_id: Optional[int] = None
     ) -> str:
         """
         Fetch manifest from dbt Cloud and save to file.
 
+        The artifact is streamed to disk as-is without being parsed.
+
         Args:
             job_id: dbt Cloud job ID
             output_path: Path where to save manifest.json
@@ -132,24 +500,20 @@ class DbtCloudClient:
         Returns:
             Path to saved manifest file
         """
-        manifest = self.get_manifest_from_job(job_id, run_id)
-
-        output_file = Path(output_path)
-        output_file.parent.mkdir(parents=True, exist_ok=True)
-
-        with open(output_file, 'w') as f:
-            json.dump(manifest, f, indent=2)
+        run_id = self.resolve_run_id(job_id, run_id)
+        output_file = self.get_run_artifact_raw(run_id, "manifest.json", output_path)
 
         logger.info(f"Manifest saved to {output_file}")
-        return str(output_file)
+        return output_file
 
 
 def fetch_manifest_from_dbt_cloud(
     api_token: str,
     account_id: str,
     job_id: str,
-    run_id: Optional[str] = None,
-    output_path: Optional[str] = None
+    run_id: Optional[int] = None,
+    output_path: Optional[str] = None,
+    cache_dir: Optional[str] = DEFAULT_CACHE_DIR
 ) -> Dict[str, Any]:
     """
     Convenience function to fetch manifest from dbt Cloud.
@@ -160,13 +524,19 @@ def fetch_manifest_from_dbt_cloud(
         job_id: dbt Cloud job ID
         run_id: Optional specific run ID
         output_path: Optional path to save manifest
+        cache_dir: Directory caching parsed manifests by run ID, so a repeated run is
+            served without a download (None disables it). Not used with `output_path`,
+            which always downloads the artifact as-is.
 
     Returns:
         manifest.json as dict
     """
-    client = DbtCloudClient(api_token, account_id)
+    with DbtCloudClient(api_token, account_id, cache_dir=cache_dir) as client:
+        if not output_path:
+            return client.get_manifest_from_job(job_id, run_id)
 
-    if output_path:
-        client.save_manifest_to_file(job_id, output_path, run_id)
+        # Download once and parse the saved copy rather than fetching the manifest twice
+        saved_path = client.save_manifest_to_file(job_id, output_path, run_id)
 
-    return client.get_manifest_from_job(job_id, run_id)
+    with open(saved_path, 'rb') as f:
+        return _loads(f.read())
@@ -1,97 +1,406 @@
+import asyncio
+import importlib.metadata
 import json
+import mmap
+import os
+import re
 import subprocess
+from collections import ChainMap, defaultdict
+from functools import cached_property, lru_cache
 from pathlib import Path
-from typing import List, Dict, Set, Any
+from typing import List, Dict, Set, Any, Iterator, Mapping, Optional, Tuple
 import logging
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
 logger = logging.getLogger(__name__)
 
+# Node fields read from the production manifest; everything else is dropped by the projection
+PROJECTED_NODE_FIELDS = ('resource_type', 'database', 'schema', 'alias', 'name')
+PROJECTED_CONFIG_FIELDS = ('materialized', 'schema')
+
+# Plain-text dbt ls lines that are logging rather than node names: lines starting with an
+# ANSI escape or a bracketed timestamp, and the usual startup/summary messages
+_DBT_LS_NOISE = re.compile(r'^(?:\x1b\[|\[)|Running with dbt|Registered adapter|Found|models,|data tests,')
+
+# Shared stand-in for a missing config, so lookups don't allocate a new dict per node
+_EMPTY: Dict[str, Any] = {}
+
+
+@lru_cache(maxsize=4)
+def _load_manifest_cached(path: str, mtime_ns: int, size: int) -> Dict[str, Any]:
+    """
+    Parse a manifest file, memory-mapped and decoded with orjson when it is installed.
+    `mtime_ns` and `size` only key the cache, so a rewritten file is parsed again.
+    """
+    try:
+        with open(path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if orjson is None:
+                    return json.loads(bytes(mm))
+                # orjson parses straight from the mapped pages, without copying them into bytes;
+                # the view must be released before the map can close
+                with memoryview(mm) as view:
+                    return orjson.loads(view)
+    except ValueError as e:
+        # Covers json/orjson decode errors as well as mmap of an empty file
+        raise ValueError(f"Invalid JSON in manifest file {path}: {e}")
+
+
+def _project_node(node: Dict[str, Any]) -> Dict[str, Any]:
+    """Keep only the node fields this package reads; absent fields stay absent."""
+    projected = {field: node[field] for field in PROJECTED_NODE_FIELDS if field in node}
+    config = node.get('config') or _EMPTY
+    projected['config'] = {field: config[field] for field in PROJECTED_CONFIG_FIELDS if field in config}
+    return projected
+
+
+@lru_cache(maxsize=4)
+def _load_manifest_projection_cached(path: str, mtime_ns: int, size: int) -> Dict[str, Any]:
+    """
+    Stream `nodes` and `sources` out of a manifest file with ijson, projecting each entry
+    as it is read so the full manifest is never held in memory.
+    The file is read in a single pass; events are routed by nesting depth: top-level keys
+    at depth 1, entry keys at depth 2, and each entry's contents below that.
+    `mtime_ns` and `size` only key the cache, so a rewritten file is parsed again.
+    """
+    projection = {'nodes': {}, 'sources': {}}
+    depth = 0
+    top_key = section = key = builder = None
+    try:
+        with open(path, 'rb') as f:
+            for event, value in ijson.basic_parse(f, use_float=True):
+                if builder is not None:
+                    builder.event(event, value)
+                    if event == 'start_map' or event == 'start_array':
+                        depth += 1
+                    elif event == 'end_map' or event == 'end_array':
+                        depth -= 1
+                    if depth == 2:
+                        section[key] = _project_node(builder.value)
+                        builder = None
+                elif event == 'map_key':
+                    if depth == 1:
+                        top_key = value
+                    elif depth == 2 and section is not None:
+                        key = value
+                        builder = ijson.ObjectBuilder()
+                elif event == 'start_map' or event == 'start_array':
+                    depth += 1
+                    if depth == 2:
+                        section = projection.get(top_key)
+                elif event == 'end_map' or event == 'end_array':
+                    depth -= 1
+    except ijson.JSONError as e:
+        raise ValueError(f"Invalid JSON in manifest file {path}: {e}")
+    return projection
+
+
+def clear_manifest_cache():
+    """Drop all parsed manifests held in the process-level cache."""
+    _load_manifest_cached.cache_clear()
+    _load_manifest_projection_cached.cache_clear()
+
 
 class DbtHelper:
     """Helper class for interacting with dbt and parsing manifests."""
 
-    def __init__(self, dbt_project_dir: str, prod_manifest_path: str):
+    def __init__(self, dbt_project_dir: str, prod_manifest_path: str, use_dbt_runner: bool = True):
         self.dbt_project_dir = Path(dbt_project_dir).resolve()
         self.prod_manifest_path = Path(prod_manifest_path).resolve()
-        self.prod_manifest = self._load_manifest(self.prod_manifest_path)
+        # Run dbt in-process when dbt-core is importable, instead of spawning the CLI
+        self.use_dbt_runner = use_dbt_runner
+        # The manifest itself is parsed on first use; only check that it is there
+        if not self.prod_manifest_path.is_file():
+            raise FileNotFoundError(f"Manifest file not found: {self.prod_manifest_path}")
 
     def _load_manifest(self, manifest_path: Path) -> Dict[str, Any]:
-        """Load and parse a dbt manifest.json file."""
+        """
+        Load and parse a dbt manifest.json file.
+        Parsed manifests are cached per process until the file changes.
+        """
         try:
-            with open(manifest_path, 'r') as f:
-                return json.load(f)
+            st = manifest_path.stat()
         except FileNotFoundError:
             raise FileNotFoundError(f"Manifest file not found: {manifest_path}")
-        except json.JSONDecodeError as e:
-            raise ValueError(f"Invalid JSON in manifest file {manifest_path}: {e}")
 
-    def get_modified_nodes(self) -> Set[str]:
+        return _load_manifest_cached(str(manifest_path), st.st_mtime_ns, st.st_size)
+
+    @cached_property
+    def prod_manifest(self) -> Dict[str, Any]:
         """
-        Run 'dbt ls --select state:modified --defer' to get modified nodes.
-        Returns a set of unique node IDs (only directly modified nodes, not downstream dependencies).
+        The full production manifest, parsed on first access.
+        Lookups done by this package only need `prod_manifest_projection`.
         """
-        logger.info("Running dbt ls to detect modified nodes...")
+        return self._load_manifest(self.prod_manifest_path)
+
+    @cached_property
+    def prod_manifest_projection(self) -> Dict[str, Any]:
+        """
+        The `nodes` and `sources` of the production manifest, limited to the fields this
+        package reads. Streamed with ijson when it is installed; otherwise this is the
+        full parsed manifest, which has the same shape.
+
+        Streaming trades speed for memory: it never holds the full manifest, but parses
+        about twice as slowly as orjson, and is used even when orjson is installed too.
+        """
+        if ijson is None:
+            return self.prod_manifest
+
+        st = self.prod_manifest_path.stat()
+        return _load_manifest_projection_cached(
+            str(self.prod_manifest_path), st.st_mtime_ns, st.st_size
+        )
+
+    @cached_property
+    def _candidate_id_sets(self) -> Tuple[Set[str], Set[str]]:
+        """Unique IDs of the incremental models and of the snapshots, collected in one pass."""
+        incremental_ids = set()
+        snapshot_ids = set()
+        for node_key, node in self.prod_manifest_projection.get('nodes', {}).items():
+            # The unique ID prefix is the resource type, so tests, seeds etc. are skipped
+            # without looking at the node at all
+            if node_key.startswith('snapshot.'):
+                if node.get('resource_type') == 'snapshot':
+                    snapshot_ids.add(node_key)
+                continue
+            if not node_key.startswith('model.'):
+                continue
+
+            if node.get('resource_type') != 'model':
+                continue
+            if (node.get('config') or _EMPTY).get('materialized') == 'incremental':
+                incremental_ids.add(node_key)
+        return incremental_ids, snapshot_ids
+
+    @property
+    def _incremental_ids(self) -> Set[str]:
+        """Unique IDs of all incremental models in the production manifest."""
+        return self._candidate_id_sets[0]
 
-        cmd = [
+    @property
+    def _snapshot_ids(self) -> Set[str]:
+        """Unique IDs of all snapshots in the production manifest."""
+        return self._candidate_id_sets[1]
+
+    @cached_property
+    def _incremental_snapshot_ids(self) -> Set[str]:
+        """Unique IDs of all incremental models and snapshots in the production manifest."""
+        return self._incremental_ids | self._snapshot_ids
+
+    @cached_property
+    def _prod_all(self) -> Mapping[str, Dict[str, Any]]:
+        """All nodes and sources in the production manifest, keyed by unique ID, without copying them."""
+        manifest = self.prod_manifest_projection
+        return ChainMap(manifest.get('nodes', {}), manifest.get('sources', {}))
+
+    @cached_property
+    def _name_index(self) -> Dict[str, List[str]]:
+        """Unique IDs in the production manifest grouped by their last dotted segment (the name)."""
+        index = defaultdict(list)
+        for section in self._prod_all.maps:
+            for unique_id in section:
+                index[unique_id.rsplit('.', 1)[-1]].append(unique_id)
+        return dict(index)
+
+    def _build_ls_command(self) -> List[str]:
+        """Build the dbt ls command used to detect modified nodes."""
+        return [
             "dbt", "ls",
             "--select", "state:modified+",
             "--defer",
             "--state", str(self.prod_manifest_path.parent),
             "--project-dir", str(self.dbt_project_dir),
+            "--output", "json",
+            "--log-format", "json",
             "--quiet"
         ]
 
+    def _build_ls_env(self) -> Dict[str, str]:
+        """Environment for dbt ls, with colored output disabled."""
+        return {**os.environ, "NO_COLOR": "1"}
+
+    @staticmethod
+    def _ls_unique_id(obj: Dict[str, Any], loads) -> Optional[str]:
+        """
+        Return the unique_id of a node printed by dbt ls, or None for any other log event.
+        With `--log-format json`, dbt >= 1.5 wraps each listed node in a ListCmdOut event
+        whose data.msg holds the node's JSON as a string; older versions print it bare.
+        """
+        info = obj.get('info')
+        if isinstance(info, dict):
+            if info.get('name') != 'ListCmdOut':
+                return None
+            msg = (obj.get('data') or {}).get('msg') or ''
+            try:
+                obj = loads(msg)
+            except ValueError:
+                # Not JSON output, so the message is the listed node itself
+                return msg.strip() or None
+            if not isinstance(obj, dict):
+                return None
+        return obj.get('unique_id')
+
+    def _parse_ls_output(self, stdout: str) -> Set[str]:
+        """
+        Parse dbt ls output.
+        With `--output json` every node is a JSON object carrying its unique_id, possibly
+        wrapped in a ListCmdOut log event; other JSON lines are structured log events.
+        Plain-text lines are handled with the legacy filter.
+        """
+        loads = orjson.loads if orjson else json.loads
+        modified_nodes = set()
+        for line in stdout.strip().split('\n'):
+            line = line.strip()
+            # Skip empty lines
+            if not line:
+                continue
+            if line.startswith('{'):
+                try:
+                    obj = loads(line)
+                except ValueError:
+                    obj = None
+                if isinstance(obj, dict):
+                    unique_id = self._ls_unique_id(obj, loads)
+                    if unique_id:
+                        modified_nodes.add(unique_id)
+                    continue
+            # Filter out logging lines (ANSI codes, timestamps, common log patterns)
+            if _DBT_LS_NOISE.search(line):
+                continue
+            # This should be a model name
+            modified_nodes.add(line)
+
+        logger.info(f"Found {len(modified_nodes)} modified nodes")
+        logger.info(f"Modified nodes: {modified_nodes}")
+        return modified_nodes
+
+    @cached_property
+    def _dbt_runner(self) -> Optional[Any]:
+        """A reusable in-process dbt runner, or None if dbt-core can't be imported here."""
+        if not self.use_dbt_runner:
+            return None
+        try:
+            from dbt.cli.main import dbtRunner
+        except ImportError:
+            logger.debug("dbt-core is not importable, running dbt ls as a subprocess")
+            return None
+
+        try:
+            version = importlib.metadata.version("dbt-core")
+        except importlib.metadata.PackageNotFoundError:
+            version = "(version unknown)"
+        # This dbt-core may differ from the `dbt` on PATH, so say which one is used
+        logger.info(f"Running dbt ls in-process with dbt-core {version}")
+        return dbtRunner()
+
+    def _run_ls_in_process(self, cmd: List[str]) -> Optional[Set[str]]:
+        """
+        Run dbt ls through dbtRunner and parse its output.
+        Returns None if the in-process runner is unavailable.
+        """
+        runner = self._dbt_runner
+        if runner is None:
+            return None
+
+        # Nodes come back in res.result; in-process, dbt's stdout log would go to our own stdout
+        args = cmd[1:] + ["--log-level", "none"]
+        if "DBT_PROFILES_DIR" not in os.environ and (self.dbt_project_dir / "profiles.yml").exists():
+            # The CLI runs inside the project directory, where dbt looks for profiles.yml first
+            args += ["--profiles-dir", str(self.dbt_project_dir)]
+
+        res = runner.invoke(args)
+        if not res.success:
+            error_msg = str(res.exception) if res.exception else "dbt ls reported errors"
+            raise self._ls_error(cmd, error_msg)
+
+        # For ls, the result is the list of printed lines
+        return self._parse_ls_output("\n".join(str(line) for line in res.result or []))
+
+    def _ls_error(self, cmd: List[str], error_msg: str) -> RuntimeError:
+        """Log a dbt ls failure and build the error to raise."""
+        logger.error(f"dbt ls command failed: {error_msg}")
+        logger.error(f"Command: {' '.join(cmd)}")
+        return RuntimeError(f"Failed to run dbt ls: {error_msg}")
+
+    def get_modified_nodes(self) -> Set[str]:
+        """
+        Run 'dbt ls --select state:modified --defer' to get modified nodes.
+        Returns a set of unique node IDs (only directly modified nodes, not downstream dependencies).
+        """
+        logger.info("Running dbt ls to detect modified nodes...")
+
+        cmd = self._build_ls_command()
+
+        modified_nodes = self._run_ls_in_process(cmd)
+        if modified_nodes is not None:
+            return modified_nodes
+
         try:
             result = subprocess.run(
                 cmd,
                 capture_output=True,
                 text=True,
                 check=True,
-                cwd=self.dbt_project_dir
+                cwd=self.dbt_project_dir,
+                env=self._build_ls_env()
             )
+        except subprocess.CalledProcessError as e:
+            error_msg = e.stderr if e.stderr else e.stdout if e.stdout else str(e)
+            raise self._ls_error(cmd, error_msg)
 
-            # Parse output - each line is a model unique_id
-            # Filter out logging lines that start with ANSI escape codes or timestamps
-            modified_nodes = set()
-            for line in result.stdout.strip().split('\n'):
-                line = line.strip()
-                # Skip empty lines
-                if not line:
-                    continue
-                # Skip lines that start with ANSI codes (colored logging output)
-                if line.startswith('[0m') or line.startswith('['):
-                    continue
-                # Skip common log patterns
-                if any(pattern in line for pattern in [
-                    'Running with dbt',
-                    'Registered adapter',
-                    'Found',
-                    'models,',
-                    'data tests,'
-                ]):
-                    continue
-                # This should be a model name
-                modified_nodes.add(line)
+        return self._parse_ls_output(result.stdout)
+
+    async def get_modified_nodes_async(self) -> Set[str]:
+        """
+        Async variant of get_modified_nodes().
+        The event loop stays free while dbt parses the project, so other work can overlap it.
+        """
+        logger.info("Running dbt ls to detect modified nodes...")
 
-            logger.info(f"Found {len(modified_nodes)} modified nodes")
-            logger.info(f"Modified nodes: {modified_nodes}")
+        cmd = self._build_ls_command()
+
+        # dbt-core is imported and run on a worker thread so the loop is not blocked
+        modified_nodes = await asyncio.to_thread(self._run_ls_in_process, cmd)
+        if modified_nodes is not None:
             return modified_nodes
 
-        except subprocess.CalledProcessError as e:
-            error_msg = e.stderr if e.stderr else e.stdout if e.stdout else str(e)
-            logger.error(f"dbt ls command failed: {error_msg}")
-            logger.error(f"Command: {' '.join(cmd)}")
-            raise RuntimeError(f"Failed to run dbt ls: {error_msg}")
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            cwd=self.dbt_project_dir,
+            env=self._build_ls_env()
+        )
+        stdout, stderr = await process.communicate()
+        stdout = stdout.decode()
+        stderr = stderr.decode()
 
-    def filter_incremental_and_snapshots(
+        if process.returncode != 0:
+            error_msg = stderr if stderr else stdout if stdout else (
+                f"Command returned non-zero exit status {process.returncode}"
+            )
+            raise self._ls_error(cmd, error_msg)
+
+        return self._parse_ls_output(stdout)
+
+    def iter_incremental_and_snapshots(
         self,
         modified_nodes: Set[str]
-    ) -> List[Dict[str, Any]]:
+    ) -> Iterator[Dict[str, Any]]:
         """
-        Filter modified nodes to only include incremental models and snapshots
-        that exist in the production manifest.
+        Yield the modified nodes that are incremental models or snapshots
+        in the production manifest, as soon as each one is matched.
 
-        Returns a list of dicts with node information:
+        Yields dicts with node information:
         - unique_id: str
         - resource_type: str (model or snapshot)
         - materialization: str
@@ -99,64 +408,60 @@ class DbtHelper:
         - schema: str
         - alias/name: str
         """
-        filtered_nodes = []
+        matched = 0
+        candidate_ids = self._incremental_snapshot_ids
+        snapshot_ids = self._snapshot_ids
 
         # Get all nodes from prod manifest
-        prod_nodes = self.prod_manifest.get('nodes', {})
-        prod_sources = self.prod_manifest.get('sources', {})
-        all_prod = {**prod_nodes, **prod_sources}
+        all_prod = self._prod_all
+        name_index = self._name_index
 
         for node_name in modified_nodes:
             # Try to find the node in production manifest
-            # node_name from dbt ls is like: DbtEducationalDataProject.marts.core.model_name
-            # manifest keys are like: model.DbtEducationalDataProject.model_name
-            # We need to extract the model name and match it
-
-            # Get the last part (model name)
-            model_name = node_name.split('.')[-1]
-
-            # Find matching keys
-            matching_keys = [k for k in all_prod.keys() if model_name in k and k.endswith(model_name)]
+            # With JSON output, node_name is already a manifest key: model.DbtEducationalDataProject.model_name
+            if node_name in all_prod:
+                matching_keys = (node_name,)
+            else:
+                # Plain dbt ls output is like: DbtEducationalDataProject.marts.core.model_name
+                # We need to extract the model name and match it
+                model_name = node_name.split('.')[-1]
+                matching_keys = name_index.get(model_name, ())
 
             if not matching_keys:
                 logger.debug(f"Node {node_name} not found in production manifest, skipping")
                 continue
 
-            for node_key in matching_keys:
+            # Only incremental models and snapshots are copied; sorted for a stable copy order
+            for node_key in sorted(candidate_ids.intersection(matching_keys)):
                 node = all_prod[node_key]
                 resource_type = node.get('resource_type')
+                materialization = 'snapshot' if node_key in snapshot_ids else 'incremental'
 
-                # Check if it's a model with incremental materialization or a snapshot
-                if resource_type == 'model':
-                    config = node.get('config', {})
-                    materialization = config.get('materialized')
-
-                    if materialization == 'incremental':
-                        filtered_nodes.append({
-                            'unique_id': node_key,
-                            'resource_type': resource_type,
-                            'materialization': materialization,
-                            'database': node.get('database'),
-                            'schema': node.get('schema'),
-                            'alias': node.get('alias', node.get('name')),
-                            'name': node.get('name')
-                        })
-                        logger.debug(f"Added incremental model: {node_key}")
-
-                elif resource_type == 'snapshot':
-                    filtered_nodes.append({
-                        'unique_id': node_key,
-                        'resource_type': resource_type,
-                        'materialization': 'snapshot',
-                        'database': node.get('database'),
-                        'schema': node.get('schema'),
-                        'alias': node.get('alias', node.get('name')),
-                        'name': node.get('name')
-                    })
-                    logger.debug(f"Added snapshot: {node_key}")
+                logger.debug(f"Added {materialization}: {node_key}")
+                matched += 1
+                yield {
+                    'unique_id': node_key,
+                    'resource_type': resource_type,
+                    'materialization': materialization,
+                    'database': node.get('database'),
+                    'schema': node.get('schema'),
+                    'alias': node.get('alias', node.get('name')),
+                    'name': node.get('name')
+                }
 
         logger.info(
-            f"Filtered to {len(filtered_nodes)} incremental models/snapshots "
+            f"Filtered to {matched} incremental models/snapshots "
             f"from {len(modified_nodes)} modified nodes"
         )
-        return filtered_nodes
+
+    def filter_incremental_and_snapshots(
+        self,
+        modified_nodes: Set[str]
+    ) -> List[Dict[str, Any]]:
+        """
+        Filter modified nodes to only include incremental models and snapshots
+        that exist in the production manifest.
+
+        Returns a list of the dicts yielded by `iter_incremental_and_snapshots`.
+        """
+        return list(self.iter_incremental_and_snapshots(modified_nodes))
@@ -0,0 +1,132 @@
+import logging
+import re
+import sqlite3
+import time
+
+import pytest
+from sqlalchemy import event, text
+
+from dbt_incremental_ci.copier import TableCopier
+
+TABLES = ["orders", "missing", "customers", "payments", "refunds"]
+
+
+def _node(alias):
+    return {
+        "unique_id": f"model.shop.{alias}",
+        "database": None,
+        "schema": "prod",
+        "alias": alias,
+        "materialization": "incremental",
+    }
+
+
+@pytest.fixture
+def copier_factory(tmp_path):
+    """A SQLite copier whose `prod` schema is an attached database with every table but `missing`."""
+    prod_path = tmp_path / "prod.db"
+    with sqlite3.connect(prod_path) as conn:
+        for table in TABLES:
+            if table != "missing":
+                conn.execute(f"CREATE TABLE {table} (id INTEGER)")
+                conn.execute(f"INSERT INTO {table} VALUES (1), (2)")
+
+    copiers = []
+
+    def make(threads):
+        copier = TableCopier(f"sqlite:///{tmp_path / 'ci.db'}", "main", threads=threads)
+
+        @event.listens_for(copier.engine, "connect")
+        def attach_prod(dbapi_conn, _record):
+            dbapi_conn.execute(f"ATTACH DATABASE '{prod_path}' AS prod")
+
+        copiers.append(copier)
+        return copier
+
+    yield make
+    for copier in copiers:
+        copier.close()
+
+
+def _skipped(caplog):
+    for record in caplog.records:
+        match = re.match(r"Skipped (\d+) tables", record.getMessage())
+        if match:
+            return int(match.group(1))
+    return 0
+
+
+@pytest.mark.parametrize("streaming", [False, True], ids=["list", "stream"])
+def test_sequential_fail_fast_stops_after_first_failure(copier_factory, caplog, streaming):
+    copier = copier_factory(threads=1)
+    nodes = [_node(table) for table in TABLES]
+
+    with caplog.at_level(logging.INFO, logger="dbt_incremental_ci.copier"):
+        results = copier.copy_tables(iter(nodes) if streaming else nodes, fail_fast=True)
+
+    assert [r["status"] for r in results] == ["success", "failed"]
+    assert results[1]["unique_id"] == "model.shop.missing"
+    assert _skipped(caplog) == 3
+    with copier.engine.connect() as conn:
+        assert conn.execute(text("SELECT count(*) FROM main.orders")).scalar() == 2
+
+
+@pytest.mark.parametrize("streaming", [False, True], ids=["list", "stream"])
+def test_sequential_without_fail_fast_copies_everything(copier_factory, caplog, streaming):
+    copier = copier_factory(threads=1)
+    nodes = [_node(table) for table in TABLES]
+
+    with caplog.at_level(logging.INFO, logger="dbt_incremental_ci.copier"):
+        results = copier.copy_tables(iter(nodes) if streaming else nodes)
+
+    assert [r["status"] for r in results] == ["success", "failed", "success", "success", "success"]
+    assert _skipped(caplog) == 0
+
+
+@pytest.mark.parametrize("streaming", [False, True], ids=["list", "stream"])
+def test_parallel_fail_fast_cancels_pending_copies(copier_factory, caplog, streaming):
+    copier = copier_factory(threads=2)
+    # The failing copy goes first, and each successful one is slow enough to still be running when it fails
+    nodes = [_node("missing")] + [_node(table) for table in TABLES if table != "missing"]
+
+    @event.listens_for(copier.engine, "before_cursor_execute")
+    def slow_copy(_conn, _cursor, statement, *_args):
+        if statement.startswith("CREATE TABLE") and "missing" not in statement:
+            time.sleep(0.2)
+
+    with caplog.at_level(logging.INFO, logger="dbt_incremental_ci.copier"):
+        results = copier.copy_tables(iter(nodes) if streaming else nodes, fail_fast=True)
+
+    # The worker that hit the failure may pick up one more copy before the rest are cancelled
+    statuses = [r["status"] for r in results]
+    assert statuses.count("failed") == 1
+    assert set(statuses) <= {"success", "failed"}
+    assert len(results) + _skipped(caplog) == len(nodes)
+    assert _skipped(caplog) >= 2
+
+
+def test_schema_creation_is_attempted_once(copier_factory, caplog):
+    copier = copier_factory(threads=2)
+    nodes = [_node(table) for table in TABLES if table != "missing"]
+
+    with caplog.at_level(logging.INFO, logger="dbt_incremental_ci.copier"):
+        results = copier.copy_tables(iter(nodes))
+
+    # SQLite has no CREATE SCHEMA, so the attempt fails; it must not be retried for every table
+    assert [r["status"] for r in results] == ["success"] * len(nodes)
+    warnings = [r for r in caplog.records if r.getMessage().startswith("Could not create schema")]
+    assert len(warnings) == 1
+
+
+@pytest.mark.parametrize("uri, streams", [
+    ("postgresql+psycopg2://ci@localhost/analytics", True),
+    ("postgresql+psycopg://ci@localhost/analytics", False),
+])
+def test_dry_run_shows_stream_copy_only_for_psycopg2(uri, streams):
+    copier = TableCopier(uri, "ci", dry_run=True)
+    node = dict(_node("orders"), database="raw")
+
+    [result] = copier.copy_tables([node])
+
+    assert result["status"] == "dry_run"
+    assert ("COPY prod.orders TO STDOUT" in result["query"]) is streams
@@ -0,0 +1,155 @@
+import json
+
+import pytest
+
+from dbt_incremental_ci.dbt_helper import DbtHelper, _load_manifest_projection_cached, _project_node
+
+
+def _log_event(name, msg, data):
+    """A dbt structured log line, as printed with --log-format json."""
+    return json.dumps({
+        "data": data,
+        "info": {
+            "category": "",
+            "extra": {},
+            "invocation_id": "6a3c2f0e-5b7d-4a55-9a5e-0c3f3d1a2b4c",
+            "level": "info",
+            "msg": msg,
+            "name": name,
+            "pid": 4242,
+            "thread": "MainThread",
+            "ts": "2024-05-02T10:15:30.123456Z",
+        },
+    })
+
+
+def _list_cmd_out(node):
+    """A node listed by `dbt ls --output json --log-format json` on dbt >= 1.5."""
+    msg = json.dumps(node)
+    return _log_event("ListCmdOut", msg, {"msg": msg})
+
+
+@pytest.fixture
+def helper(tmp_path):
+    manifest = tmp_path / "manifest.json"
+    manifest.write_text('{"nodes": {}, "sources": {}}')
+    return DbtHelper(str(tmp_path), str(manifest), use_dbt_runner=False)
+
+
+@pytest.fixture
+def ls_envelope_output():
+    return "\n".join([
+        _log_event(
+            "MainReportVersion",
+            "Running with dbt=1.8.2",
+            {"version": "=1.8.2", "log_version": 3},
+        ),
+        _log_event("FoundStats", "Found 12 models, 3 snapshots", {"stat_line": "12 models, 3 snapshots"}),
+        _list_cmd_out({
+            "name": "orders_incremental",
+            "resource_type": "model",
+            "package_name": "shop",
+            "original_file_path": "models/orders_incremental.sql",
+            "unique_id": "model.shop.orders_incremental",
+            "alias": "orders_incremental",
+            "config": {"enabled": True, "materialized": "incremental"},
+        }),
+        _list_cmd_out({
+            "name": "customers_snapshot",
+            "resource_type": "snapshot",
+            "package_name": "shop",
+            "original_file_path": "snapshots/customers_snapshot.sql",
+            "unique_id": "snapshot.shop.customers_snapshot",
+            "alias": "customers_snapshot",
+            "config": {"enabled": True, "materialized": "snapshot"},
+        }),
+    ])
+
+
+def test_parse_ls_output_unwraps_list_cmd_out_events(helper, ls_envelope_output):
+    assert helper._parse_ls_output(ls_envelope_output) == {
+        "model.shop.orders_incremental",
+        "snapshot.shop.customers_snapshot",
+    }
+
+
+def test_parse_ls_output_reads_bare_json_nodes(helper):
+    stdout = json.dumps({"name": "orders", "unique_id": "model.shop.orders"})
+    assert helper._parse_ls_output(stdout) == {"model.shop.orders"}
+
+
+def test_parse_ls_output_filters_plain_text_logging(helper):
+    stdout = "\n".join([
+        "\x1b[0m10:15:30  Running with dbt=1.4.0",
+        "10:15:31  Found 12 models, 3 snapshots",
+        "shop.orders_incremental",
+    ])
+    assert helper._parse_ls_output(stdout) == {"shop.orders_incremental"}
+
+
+def _model(name, **fields):
+    node = {
+        "name": name,
+        "resource_type": "model",
+        "database": "analytics",
+        "schema": "prod",
+        "alias": name,
+        "unique_id": f"model.shop.{name}",
+        "tags": ["nightly", ["nested", "tags"]],
+        "depends_on": {"macros": [], "nodes": ["source.shop.raw.orders"]},
+        "columns": {"id": {"name": "id", "meta": {}, "tags": [], "constraints": [{"type": "not_null"}]}},
+        "config": {"materialized": "incremental", "schema": None, "unique_key": ["id", "day"]},
+        "created_at": 1714644930.123,
+    }
+    node.update(fields)
+    return node
+
+
+@pytest.fixture
+def manifest_path(tmp_path):
+    without_alias = _model("legacy")
+    del without_alias["alias"]
+    manifest = {
+        "metadata": {"dbt_version": "1.8.2", "env": {}},
+        "child_map": {"source.shop.raw.orders": ["model.shop.orders", "model.shop.legacy"]},
+        "nodes": {
+            "model.shop.orders": _model("orders"),
+            "model.shop.legacy": without_alias,
+            "model.shop.bare": {"name": "bare", "resource_type": "model", "config": None},
+            "snapshot.shop.customers": _model(
+                "customers", resource_type="snapshot", config={"materialized": "snapshot"}
+            ),
+        },
+        "sources": {
+            "source.shop.raw.orders": {
+                "name": "orders",
+                "resource_type": "source",
+                "schema": "raw",
+                "columns": {},
+                "config": {"enabled": True},
+            },
+        },
+        "macros": {"macro.shop.m": {"name": "m", "arguments": [{"name": "x"}]}},
+        "disabled": {"model.shop.old": [_model("old")]},
+        "parent_map": {"model.shop.orders": ["source.shop.raw.orders"]},
+        "semantic_models": {},
+    }
+    path = tmp_path / "manifest.json"
+    path.write_text(json.dumps(manifest))
+    return path, manifest
+
+
+def test_manifest_projection_matches_full_parse(manifest_path):
+    pytest.importorskip("ijson")
+    path, manifest = manifest_path
+
+    projection = _load_manifest_projection_cached.__wrapped__(str(path), 0, 0)
+
+    assert projection == {
+        section: {key: _project_node(node) for key, node in manifest[section].items()}
+        for section in ("nodes", "sources")
+    }
+    assert "alias" not in projection["nodes"]["model.shop.legacy"]
+    assert projection["nodes"]["model.shop.bare"] == {
+        "name": "bare", "resource_type": "model", "config": {}
+    }